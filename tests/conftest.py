@@ -0,0 +1,69 @@
+import pytest
+
+from webscrape.fetch_archive import WarcWriter
+from webscrape.scraper import Scraper
+
+SITE = 'https://site.example.com/'
+ASSETS = 'https://assets-global.website-files.com/'
+
+PAGES = {
+    SITE: f"""<html><head><link rel="stylesheet" href="{ASSETS}site.css"></head>
+<body><img src="{ASSETS}logo.png"><a href="/about">About</a><a href="/blog/post">Post</a></body></html>""",
+    SITE + 'about': f"""<html><head><link rel="stylesheet" href="{ASSETS}site.css"></head>
+<body><a href="/">Home</a></body></html>""",
+    SITE + 'blog/post': f"""<html><body><img src="{ASSETS}photo.jpg"><a href="/">Home</a></body></html>""",
+}
+ASSETS_CONTENT = {
+    ASSETS + 'site.css': (b"body { background: url(bg.png); }", 'text/css'),
+    ASSETS + 'logo.png': (b"\x89PNG logo", 'image/png'),
+    ASSETS + 'photo.jpg': (b"\xff\xd8 photo", 'image/jpeg'),
+    ASSETS + 'bg.png': (b"\x89PNG bg", 'image/png'),
+}
+
+
+def write_archive(path, pages=PAGES, assets=ASSETS_CONTENT):
+    writer = WarcWriter(str(path))
+    for url, html in pages.items():
+        writer.write_response(url, 200, 'OK', {'Content-Type': 'text/html; charset=utf-8'},
+                              html.encode('utf-8'))
+    for url, (body, content_type) in assets.items():
+        writer.write_response(url, 200, 'OK', {'Content-Type': content_type}, body)
+    writer.close()
+    return str(path)
+
+
+def mirror_files(root):
+    return sorted(str(path.relative_to(root)) for path in root.rglob('*') if path.is_file())
+
+
+@pytest.fixture
+def site_archive(tmp_path):
+    return write_archive(tmp_path / 'site.warc.gz')
+
+
+@pytest.fixture
+def scraper_options(tmp_path):
+    # Replay options with output and state files all under tmp_path; a plain
+    # dict, as handed to distributed workers
+    def options(archive_path, **overrides):
+        urls_file = tmp_path / 'urls.json'
+        if not urls_file.exists():
+            urls_file.write_text('[]')
+        return dict({
+            'start_url': SITE,
+            'base_dir': str(tmp_path / 'mirror'),
+            'urls_file': str(urls_file),
+            'asset_mapping_file': str(tmp_path / 'asset_mapping.json'),
+            'dependency_index_file': str(tmp_path / 'dependency_index.json'),
+            'fetch_mode': 'replay',
+            'archive_path': archive_path,
+        }, **overrides)
+    return options
+
+
+@pytest.fixture
+def make_scraper(scraper_options):
+    def make(archive_path, **overrides):
+        overrides.setdefault('background_writes', False)
+        return Scraper(**scraper_options(archive_path, **overrides))
+    return make
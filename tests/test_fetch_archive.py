@@ -0,0 +1,71 @@
+import gzip
+import os
+
+import pytest
+
+from webscrape.cli import main
+from webscrape.fetch_archive import Fetcher, WarcReader, WarcWriter, build_index, load_index
+
+from conftest import ASSETS, PAGES, SITE
+
+
+def test_replay_returns_recorded_responses(site_archive):
+    fetcher = Fetcher('replay', site_archive)
+    try:
+        response = fetcher.get(SITE + 'about')
+        assert response.status_code == 200
+        assert response.text == PAGES[SITE + 'about']
+        assert response.headers['content-type'] == 'text/html; charset=utf-8'
+        assert fetcher.get(ASSETS + 'logo.png').content == b"\x89PNG logo"
+    finally:
+        fetcher.close()
+
+
+def test_missing_url_replays_as_404(site_archive):
+    fetcher = Fetcher('replay', site_archive)
+    try:
+        response = fetcher.get(SITE + 'nowhere')
+        assert response.status_code == 404
+        assert response.content == b''
+    finally:
+        fetcher.close()
+
+
+def test_index_is_rebuilt_when_missing(site_archive):
+    saved = load_index(site_archive)
+    os.remove(site_archive + '.idx.json')
+    assert build_index(site_archive) == saved
+
+    reader = WarcReader(site_archive)
+    try:
+        assert reader.get(SITE)[0] == 200
+    finally:
+        reader.close()
+    assert load_index(site_archive) == saved
+
+
+def test_large_records_are_indexed(tmp_path):
+    # Bodies bigger than the scan chunk size, compressible and not
+    path = str(tmp_path / 'big.warc.gz')
+    writer = WarcWriter(path)
+    writer.write_response(SITE + 'zeros', 200, 'OK', {}, b'\0' * 3_000_000)
+    writer.write_response(SITE + 'random', 200, 'OK', {}, os.urandom(300_000))
+    writer.write_response(SITE + 'small', 200, 'OK', {}, b'x')
+    writer.close()
+    assert build_index(path) == load_index(path)
+
+
+def test_truncated_last_record_is_skipped(site_archive):
+    with open(site_archive, 'ab') as file:
+        file.write(gzip.compress(b"WARC/1.1\r\nWARC-Type: response\r\n" + b'y' * 1000)[:20])
+    os.remove(site_archive + '.idx.json')
+    index = build_index(site_archive)
+    assert set(index) == set(PAGES) | {ASSETS + name for name in ('site.css', 'logo.png', 'photo.jpg', 'bg.png')}
+
+
+def test_missing_archive_is_a_clear_error(tmp_path):
+    missing = str(tmp_path / 'nope.warc.gz')
+    with pytest.raises(ValueError, match="Replay archive not found"):
+        Fetcher('replay', missing)
+    with pytest.raises(SystemExit, match="Replay archive not found"):
+        main(['scrape', '--mode', 'replay', '--archive', missing, '--base-dir', str(tmp_path / 'mirror')])
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from webscrape import distributed, frontier_store
+from webscrape.dependency_index import DependencyIndex
+from webscrape.frontier_store import (MAX_ATTEMPTS, LocalRedis, RedisFrontierStore, SQLiteFrontierStore,
+                                      merged_asset_mapping, partition_for)
+from webscrape.rebuild import collect_garbage
+from webscrape.scraper import Scraper
+
+from conftest import PAGES, SITE, mirror_files
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def open_two(request, tmp_path):
+    # Returns a factory for store instances that share one backend, like
+    # two workers would
+    client = LocalRedis()
+    opened = []
+
+    def open_store(partitions=1):
+        if request.param == 'sqlite':
+            store = SQLiteFrontierStore(str(tmp_path / 'frontier.db'), partitions)
+        else:
+            store = RedisFrontierStore(client, partitions)
+        opened.append(store)
+        return store
+
+    yield open_store
+    for store in opened:
+        store.close()
+
+
+@pytest.fixture
+def store(open_two):
+    return open_two()
+
+
+def test_urls_are_added_once_and_leased_once(store):
+    assert store.add([SITE, SITE + 'a', SITE]) == 2
+    assert store.add([SITE + 'a']) == 0
+    leased = {store.lease('w1', 0), store.lease('w2', 0)}
+    assert leased == {SITE, SITE + 'a'}
+    assert store.lease('w3', 0) is None
+    assert store.unfinished() == 2
+
+    for url in leased:
+        store.complete(url)
+    assert store.unfinished() == 0
+    assert store.lease('w1', 0) is None
+
+
+def test_expired_leases_are_handed_out_again(store):
+    store.add([SITE])
+    assert store.lease('crashed', 0, lease_seconds=-1) == SITE
+    assert store.lease('w2', 0) == SITE
+    # A live lease is not taken over
+    assert store.lease('w3', 0) is None
+
+
+def test_urls_are_dropped_after_max_attempts(store):
+    store.add([SITE])
+    for _ in range(MAX_ATTEMPTS):
+        assert store.lease('crashing', 0, lease_seconds=-1) == SITE
+    assert store.lease('w', 0) is None
+    assert store.unfinished() == 0
+
+
+def test_url_on_its_last_attempt_is_unfinished_while_leased(store):
+    store.add([SITE])
+    for _ in range(MAX_ATTEMPTS - 1):
+        store.lease('crashing', 0, lease_seconds=-1)
+    assert store.lease('last', 0) == SITE
+    assert store.unfinished() == 1
+    store.complete(SITE)
+    assert store.unfinished() == 0
+
+
+def test_pages_of_one_host_spread_over_partitions(open_two):
+    store = open_two(partitions=4)
+    urls = [f"{SITE}page-{i}" for i in range(40)]
+    store.add(urls)
+    assert len({partition_for(url, 4) for url in urls}) == 4
+    # Each worker takes from its own partition first
+    url = store.lease('w2', 2)
+    assert partition_for(url, 4) == 2
+    assert partition_for(SITE + 'a#top', 4) == partition_for(SITE + 'a', 4)
+
+
+def test_workers_agree_on_asset_names(open_two):
+    first, second = open_two(), open_two()
+    url = 'https://assets-global.website-files.com/a.png'
+    name = first.assign_asset(url, 'img', 'png')
+    assert second.assign_asset(url, 'img', 'png') == name == 'img-1.png'
+    assert second.assign_asset(url + '?v=2', 'img', 'png') == 'img-2.png'
+    assert first.assets() == second.assets()
+
+
+def test_merged_assets_bump_counters(store):
+    store.merge_assets({'https://x/old.css': ('css-7.css', os.path.join('site', 'css', 'css-7.css'))})
+    assert store.assign_asset('https://x/new.css', 'css', 'css') == 'css-8.css'
+    assert merged_asset_mapping(store, 'site')['https://x/old.css'] == \
+        ('css-7.css', os.path.join('site', 'css', 'css-7.css'))
+
+
+def test_reset_forgets_urls_but_keeps_asset_names(store):
+    store.add([SITE])
+    store.complete(store.lease('w', 0))
+    store.assign_asset('https://x/a.js', 'js', 'js')
+
+    store.reset()
+    assert store.add([SITE]) == 1
+    assert store.lease('w', 0) == SITE
+    assert store.assign_asset('https://x/b.js', 'js', 'js') == 'js-2.js'
+
+
+def test_seed_starts_over_unless_resuming(store, make_scraper, site_archive, capsys):
+    scraper = make_scraper(site_archive)
+    distributed.seed(store, scraper, urls=[])
+    store.complete(store.lease('w', 0))
+
+    assert distributed.seed(store, scraper, urls=[]) == 1
+    assert distributed.seed(store, scraper, urls=[], resume=True) == 0
+    assert store.unfinished() == 1
+
+    store.complete(store.lease('w', 0))
+    capsys.readouterr()
+    distributed.seed(store, scraper, urls=[], resume=True)
+    assert "nothing left to crawl" in capsys.readouterr().out
+
+
+def test_repeated_memory_runs_crawl_again(tmp_path, scraper_options, site_archive, monkeypatch):
+    monkeypatch.setattr(distributed, 'POLL_INTERVAL', 0.01)
+    for _ in range(2):
+        shutil.rmtree(tmp_path / 'mirror', ignore_errors=True)
+        distributed.run('memory://test', 2, scraper_options(site_archive))
+        assert (tmp_path / 'mirror' / 'about.html').exists()
+    # The in-process store is freed once the run is over
+    assert 'test' not in frontier_store._local_redis
+
+
+@pytest.mark.parametrize('store_url', ['memory://index', 'sqlite:///{tmp}/frontier.db'])
+def test_distributed_run_saves_the_index(tmp_path, scraper_options, site_archive, monkeypatch, store_url):
+    monkeypatch.setattr(distributed, 'POLL_INTERVAL', 0.01)
+    options = scraper_options(site_archive)
+    distributed.run(store_url.format(tmp=tmp_path), 2, options)
+
+    index = DependencyIndex.load(str(tmp_path / 'dependency_index.json'))
+    assert set(index.pages) == set(PAGES)
+    files = mirror_files(tmp_path / 'mirror')
+    mapping = (tmp_path / 'asset_mapping.json').read_text()
+    assert len(json.loads(mapping)) == 3
+
+    # gc afterwards trusts the index and finds nothing to remove
+    collect_garbage(Scraper(**options))
+    assert mirror_files(tmp_path / 'mirror') == files
+    assert (tmp_path / 'asset_mapping.json').read_text() == mapping
+
+
+def test_recorded_pages_are_shared_and_reset(open_two):
+    first, second = open_two(), open_two()
+    entry = {'output': 'mirror/index.html', 'hash': 'h', 'assets': ['https://x/a.css'], 'links': []}
+    first.record_page(SITE, entry, {'https://x/a.css': ['https://x/bg.png']})
+    second.record_page(SITE + 'gone', None, {})
+    assert second.recorded_pages() == (
+        {SITE: entry, SITE + 'gone': None}, {'https://x/a.css': ['https://x/bg.png']})
+
+    first.reset()
+    assert second.recorded_pages() == ({}, {})
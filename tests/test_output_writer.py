@@ -0,0 +1,73 @@
+import os
+import stat
+
+import pytest
+
+from webscrape.output_writer import OutputWriter
+
+
+@pytest.fixture(params=[True, False], ids=['background', 'inline'])
+def writer(request):
+    writer = OutputWriter(background=request.param)
+    yield writer
+    writer.close()
+
+
+def test_unchanged_content_is_not_rewritten(tmp_path, writer):
+    path = tmp_path / 'out' / 'page.html'
+    writer.write(str(path), '<p>hi</p>')
+    writer.flush()
+    before = path.stat().st_mtime_ns
+
+    second = OutputWriter(background=False)
+    second.write(str(path), '<p>hi</p>')
+    assert second.stats == {'written': 0, 'unchanged': 1, 'failed': 0}
+    assert path.stat().st_mtime_ns == before
+
+    second.write(str(path), '<p>changed</p>')
+    assert second.stats['written'] == 1
+    assert path.read_text() == '<p>changed</p>'
+
+
+def test_no_temp_files_are_left_behind(tmp_path, writer):
+    for i in range(5):
+        writer.write(str(tmp_path / f'f{i}.html'), f'{i}')
+    writer.flush()
+    assert sorted(os.listdir(tmp_path)) == [f'f{i}.html' for i in range(5)]
+
+
+def test_new_files_follow_the_umask(tmp_path, writer):
+    old_umask = os.umask(0o022)
+    try:
+        writer.write(str(tmp_path / 'new.html'), 'x')
+        writer.flush()
+    finally:
+        os.umask(old_umask)
+    assert stat.S_IMODE((tmp_path / 'new.html').stat().st_mode) == 0o644
+
+
+def test_replaced_files_keep_their_mode(tmp_path, writer):
+    path = tmp_path / 'kept.html'
+    path.write_text('old')
+    path.chmod(0o640)
+    writer.write(str(path), 'new')
+    writer.flush()
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_prune_removes_only_untouched_pages(tmp_path, writer):
+    (tmp_path / 'img').mkdir()
+    (tmp_path / 'img' / 'keep.html').write_text('asset folder')
+    (tmp_path / 'stale.html').write_text('old page')
+    writer.write(str(tmp_path / 'index.html'), 'page')
+    removed = writer.prune(str(tmp_path), exclude=['img'])
+    assert removed == [os.path.normpath(str(tmp_path / 'stale.html'))]
+    assert (tmp_path / 'index.html').exists()
+    assert (tmp_path / 'img' / 'keep.html').exists()
+
+
+def test_kept_files_are_not_pruned(tmp_path, writer):
+    (tmp_path / 'old.html').write_text('still wanted')
+    writer.keep(str(tmp_path / 'old.html'))
+    assert writer.prune(str(tmp_path)) == []
+    assert (tmp_path / 'old.html').exists()
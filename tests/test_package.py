@@ -0,0 +1,23 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from webscrape.fetch_archive import Fetcher
+
+
+def test_import_does_not_load_heavy_modules():
+    # A fresh interpreter, since pytest itself imports some of these
+    code = ("import sys, webscrape; "
+            "print(' '.join(m for m in ('requests', 'bs4', 'http.client', 'asyncio', 'redis') "
+            "if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parent.parent)
+    assert result.stdout.strip() == ''
+
+
+def test_missing_requests_gives_an_install_hint(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'requests', None)
+    with pytest.raises(RuntimeError, match=r"pip install requests"):
+        Fetcher('live')
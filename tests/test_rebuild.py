@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from webscrape.fetch_archive import Fetcher
+from webscrape.rebuild import collect_garbage, rebuild
+
+from conftest import ASSETS, SITE, mirror_files
+
+
+@pytest.fixture
+def mirrored(tmp_path, site_archive, make_scraper):
+    make_scraper(site_archive).run()
+    return tmp_path
+
+
+def test_gc_removes_only_unreferenced_assets(mirrored, site_archive, make_scraper):
+    (mirrored / 'mirror' / 'img' / 'img-9.png').write_bytes(b'old')
+    (mirrored / 'mirror' / 'img' / 'Frame.png').write_bytes(b'hand placed')
+    collect_garbage(make_scraper(site_archive))
+    assert not (mirrored / 'mirror' / 'img' / 'img-9.png').exists()
+    assert (mirrored / 'mirror' / 'img' / 'Frame.png').exists()
+    assert (mirrored / 'mirror' / 'img' / 'img-1.png').exists()
+
+
+def test_gc_refuses_without_an_index(mirrored, site_archive, make_scraper):
+    (mirrored / 'dependency_index.json').unlink()
+    files = mirror_files(mirrored / 'mirror')
+    mapping = (mirrored / 'asset_mapping.json').read_text()
+
+    with pytest.raises(RuntimeError, match="missing or empty"):
+        collect_garbage(make_scraper(site_archive))
+    with pytest.raises(RuntimeError, match="missing or empty"):
+        rebuild(make_scraper(site_archive), [ASSETS + 'site.css'])
+    assert mirror_files(mirrored / 'mirror') == files
+    assert (mirrored / 'asset_mapping.json').read_text() == mapping
+
+
+def test_gc_refuses_when_the_index_misses_pages(mirrored, site_archive, make_scraper):
+    index_file = mirrored / 'dependency_index.json'
+    index = json.loads(index_file.read_text())
+    del index['pages'][SITE + 'blog/post']
+    index_file.write_text(json.dumps(index))
+
+    with pytest.raises(RuntimeError, match="does not cover 1 page"):
+        collect_garbage(make_scraper(site_archive))
+    assert (mirrored / 'mirror' / 'img' / 'img-2.jpg').exists()
+
+    collect_garbage(make_scraper(site_archive), force=True)
+    assert not (mirrored / 'mirror' / 'img' / 'img-2.jpg').exists()
+
+
+def test_rebuild_rescrapes_affected_pages(mirrored, site_archive, make_scraper):
+    pages = rebuild(make_scraper(site_archive), [ASSETS + 'site.css'])
+    assert pages == [SITE, SITE + 'about']
+
+
+def test_rebuild_survives_connection_errors(mirrored, site_archive, make_scraper, monkeypatch, capsys):
+    def refuse(self, url, **kwargs):
+        raise ConnectionError(f"connection refused: {url}")
+    monkeypatch.setattr(Fetcher, 'get', refuse)
+    files = mirror_files(mirrored / 'mirror')
+
+    rebuild(make_scraper(site_archive), [ASSETS + 'site.css'])
+    assert "Error fetching changed asset: connection refused" in capsys.readouterr().out
+    assert mirror_files(mirrored / 'mirror') == files
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+from webscrape.dependency_index import DependencyIndex
+from webscrape.url_policy import Rule
+
+from conftest import ASSETS, PAGES, SITE, mirror_files, write_archive
+
+
+def test_replay_run_mirrors_the_site(tmp_path, site_archive, make_scraper):
+    visited = make_scraper(site_archive).run()
+    assert visited == set(PAGES)
+
+    mirror = tmp_path / 'mirror'
+    assert mirror_files(mirror) == [
+        'about.html', 'blog/post.html', 'css/css-1.css', 'img/img-1.png', 'img/img-2.jpg', 'index.html',
+    ]
+    index_html = (mirror / 'index.html').read_text()
+    assert 'css/css-1.css' in index_html and 'img/img-1.png' in index_html
+    assert 'img/img-2.jpg' in (mirror / 'blog' / 'post.html').read_text()
+
+    mapping = json.loads((tmp_path / 'asset_mapping.json').read_text())
+    assert set(mapping) == {ASSETS + 'site.css', ASSETS + 'logo.png', ASSETS + 'photo.jpg'}
+
+    index = DependencyIndex.load(str(tmp_path / 'dependency_index.json'))
+    assert set(index.pages) == set(PAGES)
+    assert index.affected_pages([ASSETS + 'site.css']) == [SITE, SITE + 'about']
+
+
+def test_second_run_writes_nothing(tmp_path, site_archive, make_scraper, capsys):
+    make_scraper(site_archive).run()
+    before = {path: path.stat().st_mtime_ns for path in (tmp_path / 'mirror').rglob('*') if path.is_file()}
+    capsys.readouterr()
+
+    make_scraper(site_archive).run()
+    assert "Output files: 0 written" in capsys.readouterr().out
+    after = {path: path.stat().st_mtime_ns for path in (tmp_path / 'mirror').rglob('*') if path.is_file()}
+    assert after == before
+
+
+def test_policy_denied_pages_are_not_fetched(tmp_path, site_archive, make_scraper):
+    visited = make_scraper(site_archive, extra_rules=[Rule('deny', 'path', '/blog/*', 'page')]).run()
+    assert SITE + 'blog/post' in visited
+    assert not (tmp_path / 'mirror' / 'blog' / 'post.html').exists()
+    mapping = json.loads((tmp_path / 'asset_mapping.json').read_text())
+    assert ASSETS + 'photo.jpg' not in mapping
+
+
+def test_failed_run_keeps_the_previous_mirror(tmp_path, site_archive, make_scraper):
+    make_scraper(site_archive).run()
+    files = mirror_files(tmp_path / 'mirror')
+    mapping = (tmp_path / 'asset_mapping.json').read_text()
+    index = (tmp_path / 'dependency_index.json').read_text()
+
+    empty_archive = write_archive(tmp_path / 'empty.warc.gz', pages={}, assets={})
+    make_scraper(empty_archive).run()
+    assert mirror_files(tmp_path / 'mirror') == files
+    assert (tmp_path / 'asset_mapping.json').read_text() == mapping
+    assert (tmp_path / 'dependency_index.json').read_text() == index
+
+
+def test_page_that_fails_keeps_its_output_and_assets(tmp_path, site_archive, make_scraper):
+    make_scraper(site_archive).run()
+    pages = {url: html for url, html in PAGES.items() if not url.endswith('blog/post')}
+    partial_archive = write_archive(tmp_path / 'partial.warc.gz', pages=pages)
+    make_scraper(partial_archive).run()
+
+    mirror = tmp_path / 'mirror'
+    assert (mirror / 'blog' / 'post.html').exists()
+    assert (mirror / 'img' / 'img-2.jpg').exists()
+    mapping = json.loads((tmp_path / 'asset_mapping.json').read_text())
+    assert ASSETS + 'photo.jpg' in mapping
+    index = DependencyIndex.load(str(tmp_path / 'dependency_index.json'))
+    assert ASSETS + 'photo.jpg' in index.page_dependencies(SITE + 'blog/post')
+
+
+def test_pages_no_longer_linked_are_collected(tmp_path, site_archive, make_scraper):
+    make_scraper(site_archive).run()
+    pages = dict(PAGES)
+    pages[SITE] = pages[SITE].replace('<a href="/blog/post">Post</a>', '')
+    make_scraper(write_archive(tmp_path / 'unlinked.warc.gz', pages=pages)).run()
+
+    mirror = tmp_path / 'mirror'
+    assert not (mirror / 'blog' / 'post.html').exists()
+    assert not (mirror / 'img' / 'img-2.jpg').exists()
+    assert (mirror / 'img' / 'img-1.png').exists()
+
+
+def test_pages_behind_a_failed_page_are_kept(tmp_path, make_scraper):
+    pages = {
+        SITE: '<html><body><a href="/blog">Blog</a></body></html>',
+        SITE + 'blog': '<html><body><a href="/blog/post">Post</a></body></html>',
+        SITE + 'blog/post': f'<html><body><img src="{ASSETS}photo.jpg"><a href="/">Home</a></body></html>',
+    }
+    make_scraper(write_archive(tmp_path / 'full.warc.gz', pages=pages)).run()
+    files = mirror_files(tmp_path / 'mirror')
+    assert 'blog/post.html' in files
+
+    # /blog fails, so /blog/post is never reached this run
+    del pages[SITE + 'blog']
+    make_scraper(write_archive(tmp_path / 'partial.warc.gz', pages=pages)).run()
+    assert mirror_files(tmp_path / 'mirror') == files
+    index = DependencyIndex.load(str(tmp_path / 'dependency_index.json'))
+    assert set(index.pages) == {SITE, SITE + 'blog', SITE + 'blog/post'}
+
+
+def test_gathered_page_scrapes_share_assets_safely(tmp_path, site_archive, make_scraper):
+    scraper = make_scraper(site_archive)
+    scraper.load_state()
+    fetched = Counter()
+    with scraper:
+        get = scraper.fetcher.get
+
+        def counting_get(url, **kwargs):
+            fetched[url] += 1
+            time.sleep(0.01)  # widen the window between naming and download
+            return get(url, **kwargs)
+
+        scraper.fetcher.get = counting_get
+
+        async def scrape_all():
+            await asyncio.gather(*[scraper.ascrape_page(url, discover=lambda links: None)
+                                   for url in list(PAGES) * 4])
+
+        asyncio.run(scrape_all())
+
+    assert all(fetched[url] == 1 for url in fetched if url.startswith(ASSETS))
+    names = [name for name, _ in scraper.asset_mapping.values()]
+    # Which image gets which number depends on thread timing; names must not repeat
+    assert len(set(names)) == len(names) == 3
+    assert sorted(scraper.asset_counter[kind] for kind in ('css', 'img')) == [2, 3]
@@ -0,0 +1,81 @@
+import pytest
+
+from webscrape.url_policy import Rule, UrlPolicy, is_loopback_url
+
+
+@pytest.fixture
+def policy():
+    return UrlPolicy([
+        Rule('deny', 'host', 'cdn.jsdelivr.net'),
+        Rule('allow', 'host', 'website-files.com', 'asset'),
+        Rule('allow', 'host', 'example.com', 'page'),
+        Rule('deny', 'path', '/blog/*', 'page'),
+        Rule('deny', 'regex', r'\.pdf$'),
+    ])
+
+
+def test_host_rules_match_suffixes_not_substrings(policy):
+    assert policy.check('https://assets-global.website-files.com/a.png', 'asset') == \
+        (True, 'allow host website-files.com')
+    assert policy.check('https://cdn.jsdelivr.net/x.js', 'asset') == (False, 'deny host cdn.jsdelivr.net')
+    # The excluded domain only appears in the query string here
+    assert policy.check('https://evil.com/?cdn.jsdelivr.net', 'asset') == (False, 'not included (asset)')
+    assert policy.allows('https://sub.example.com/', 'page')
+    assert not policy.allows('https://notexample.com/', 'page')
+
+
+def test_deny_wins_over_allow(policy):
+    assert policy.check('https://example.com/blog/post', 'page') == (False, 'deny path /blog/*')
+    assert policy.check('https://example.com/file.pdf', 'page') == (False, 'deny regex \\.pdf$')
+    assert policy.allows('https://example.com/about', 'page')
+
+
+def test_scopes_are_separate(policy):
+    assert not policy.allows('https://example.com/img.png', 'asset')
+    assert not policy.allows('https://assets-global.website-files.com/', 'page')
+
+
+@pytest.mark.parametrize('url, reason', [
+    ('mailto:someone@example.com', 'non-http url'),
+    ('tel:+123', 'non-http url'),
+    ('http://localhost:8000/', 'loopback host'),
+    ('http://127.0.0.1/x.js', 'loopback host'),
+    ('http://[::1]/', 'loopback host'),
+])
+def test_builtin_rejections(policy, url, reason):
+    assert policy.check(url, 'page') == (False, reason)
+
+
+def test_no_allow_rules_means_default_allow():
+    assert UrlPolicy([]).check('https://anything.org/', 'asset') == (True, 'default allow')
+
+
+def test_hits_are_counted_per_rule(policy):
+    policy.check('https://cdn.jsdelivr.net/a.js', 'asset')
+    policy.check('https://cdn.jsdelivr.net/b.js', 'asset')
+    policy.check('mailto:x@y', 'page')
+    assert policy.hits['deny host cdn.jsdelivr.net'] == 2
+    assert policy.hits['non-http url'] == 1
+
+
+def test_regex_with_backreference_is_matched_on_its_own():
+    policy = UrlPolicy([Rule('deny', 'regex', r'/(\w)\1'), Rule('deny', 'regex', r'\.zip$')])
+    assert policy.check('https://a.org/xx', 'page') == (False, 'deny regex /(\\w)\\1')
+    assert policy.check('https://a.org/f.zip', 'page') == (False, 'deny regex \\.zip$')
+    assert policy.allows('https://a.org/xy', 'page')
+
+
+def test_regex_with_global_flag_is_matched_on_its_own():
+    policy = UrlPolicy([Rule('deny', 'regex', r'(?i)\.PDF$'), Rule('deny', 'regex', r'/tmp/')])
+    assert policy.check('https://a.org/file.pdf', 'page') == (False, 'deny regex (?i)\\.PDF$')
+    assert not policy.allows('https://a.org/tmp/x', 'page')
+
+
+def test_invalid_regex_names_the_rule():
+    with pytest.raises(ValueError, match=r"deny regex \(unclosed"):
+        UrlPolicy([Rule('deny', 'regex', '(unclosed')])
+
+
+def test_is_loopback_url():
+    assert is_loopback_url('http://localhost/a.js')
+    assert not is_loopback_url('https://localhost.example.com/a.js')
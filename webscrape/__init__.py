@@ -0,0 +1,15 @@
+"""Mirror a website into a static folder.
+
+Importing this package is cheap: requests, BeautifulSoup, jsmin, parser
+backends and redis are only imported when a feature first needs them.
+
+    from webscrape import Scraper
+    Scraper().run()
+"""
+from .dependency_index import DependencyIndex
+from .fetch_archive import Fetcher
+from .output_writer import OutputWriter
+from .scraper import V1_OPTIONS, Scraper
+from .url_policy import Rule, UrlPolicy
+
+__all__ = ['DependencyIndex', 'Fetcher', 'OutputWriter', 'Rule', 'Scraper', 'UrlPolicy', 'V1_OPTIONS']
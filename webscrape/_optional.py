@@ -0,0 +1,24 @@
+import importlib
+
+# pip package to suggest when a module is missing
+_PACKAGES = {
+    'bs4': 'beautifulsoup4',
+    'jsmin': 'jsmin',
+    'lxml': 'lxml',
+    'html5lib': 'html5lib',
+    'redis': 'redis',
+    'requests': 'requests',
+}
+
+
+def require(module_name, feature):
+    """Import a dependency the first time a feature needs it.
+
+    Heavy or optional packages are only imported when used, so importing
+    webscrape stays cheap and features you do not use need nothing installed.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        package = _PACKAGES.get(module_name.split('.')[0], module_name)
+        raise RuntimeError(f"{feature} needs the '{package}' package (pip install {package})") from None
@@ -0,0 +1,109 @@
+import argparse
+import os
+
+from .fetch_archive import FETCH_MODES
+from .scraper import DEFAULT_START_URL, V1_OPTIONS, Scraper
+
+
+def scraper_options(args):
+    # Plain dict so it can be handed to spawned distributed workers
+    options = dict(V1_OPTIONS) if args.v1 else {}
+    options.update(
+        start_url=args.start_url,
+        base_dir=args.base_dir,
+        urls_file=args.urls_file,
+        fetch_mode=args.mode,
+        archive_path=args.archive,
+        parser=args.parser,
+        minify_js=args.minify_js,
+    )
+    return options
+
+
+def add_scraper_arguments(parser):
+    parser.add_argument('--v1', action='store_true',
+                        help="scriptv1 behaviour: local social images/icons, webflow badge JS disabled")
+    parser.add_argument('--start-url', default=DEFAULT_START_URL)
+    parser.add_argument('--base-dir', default="seointense", help="output folder")
+    parser.add_argument('--urls-file', default="urls_to_scrape.json", help="extra URLs to scrape")
+    parser.add_argument('--mode', choices=FETCH_MODES, default=os.environ.get('SCRAPE_MODE', 'live'),
+                        help="live, record to --archive, or replay from it (default: $SCRAPE_MODE or live)")
+    parser.add_argument('--archive', default=os.environ.get('SCRAPE_ARCHIVE', 'crawl.warc.gz'))
+    parser.add_argument('--parser', default='html.parser', help="BeautifulSoup parser, e.g. lxml")
+    parser.add_argument('--minify-js', action='store_true', help="minify downloaded JS (needs jsmin)")
+
+
+def add_force_argument(parser):
+    parser.add_argument('--force', action='store_true',
+                        help="run even if the dependency index is missing or does not cover the mirror")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='webscrape', description="Mirror a website into a static folder.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_scraper_arguments(subparsers.add_parser('scrape', help="scrape the site"))
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="re-scrape only pages affected by changes")
+    add_scraper_arguments(rebuild_parser)
+    add_force_argument(rebuild_parser)
+    rebuild_parser.add_argument('changed', nargs='+', help="asset URLs, local asset paths or page URLs")
+
+    gc_parser = subparsers.add_parser('gc', help="remove unreferenced asset files")
+    add_scraper_arguments(gc_parser)
+    add_force_argument(gc_parser)
+
+    diff_parser = subparsers.add_parser('diff', help="compare two dependency indexes")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new', nargs='?', default="dependency_index.json")
+
+    distributed_parser = subparsers.add_parser('distributed', help="crawl with several workers")
+    distributed_parser.add_argument('role', choices=('run', 'worker'))
+    add_scraper_arguments(distributed_parser)
+    distributed_parser.add_argument('--store', required=True,
+                                    help="sqlite:///path.db, redis://host:port/db or memory://name")
+    distributed_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                                    help="total workers across all hosts (also the number of partitions)")
+    distributed_parser.add_argument('--index', type=int, default=0,
+                                    help="worker role: this worker's number, 0 <= index < workers")
+    distributed_parser.add_argument('--lease-seconds', type=float, default=120)
+    distributed_parser.add_argument('--resume', action='store_true',
+                                    help="run role: continue the crawl already in the store instead of starting over")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        run_command(args)
+    except (RuntimeError, ValueError) as e:
+        # Missing archive or package, bad options, an index gc cannot trust
+        raise SystemExit(str(e))
+
+
+def run_command(args):
+    if args.command == 'diff':
+        from .rebuild import diff_files
+        diff_files(args.old, args.new)
+    elif args.command == 'scrape':
+        Scraper(**scraper_options(args)).run()
+    elif args.command == 'rebuild':
+        from .rebuild import rebuild
+        rebuild(Scraper(**scraper_options(args)), args.changed, force=args.force)
+    elif args.command == 'gc':
+        from .rebuild import collect_garbage
+        collect_garbage(Scraper(**scraper_options(args)), force=args.force)
+    elif args.command == 'distributed':
+        from . import distributed
+        options = scraper_options(args)
+        if args.role == 'worker':
+            if args.mode == 'record':
+                raise ValueError("Record mode writes a single archive; use 'distributed run --workers 1'")
+            distributed.worker_main(args.store, args.index, args.workers, options, args.lease_seconds)
+        else:
+            distributed.run(args.store, args.workers, options, lease_seconds=args.lease_seconds,
+                            resume=args.resume)
+
+
+if __name__ == "__main__":
+    main()
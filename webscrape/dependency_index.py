@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import threading
+from urllib.parse import urljoin
+
+CSS_URL_RE = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)|@import\s+['"]([^'"]+)['"]""")
+# Only files named like download_file names them are ever garbage collected,
+# so hand-placed files (e.g. the og:image / favicon frames) are left alone.
+GENERATED_NAME_RE = re.compile(r"^(img|css|js|json)-\d+\.[\w]+$")
+GC_FOLDERS = ('img', 'css', 'js')
+
+
+def css_references(css_text, base_url):
+    refs = []
+    for match in CSS_URL_RE.finditer(css_text):
+        ref = (match.group(1) or match.group(2)).strip()
+        if ref and not ref.startswith(('data:', '#')):
+            refs.append(urljoin(base_url, ref))
+    return refs
+
+
+class DependencyIndex:
+    """What each output was built from, saved between runs.
+
+    pages:       page url -> {'output', 'hash', 'assets', 'links'}
+    stylesheets: stylesheet url -> urls it references (fonts, images, imports)
+
+    Used to find the pages affected by a changed asset or page, to find
+    asset files no page uses any more, and to diff two runs.
+    """
+
+    def __init__(self, pages=None, stylesheets=None):
+        self.pages = pages or {}
+        self.stylesheets = stylesheets or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+            return cls(data.get('pages'), data.get('stylesheets'))
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                print(f"Error loading dependency index: {e}")
+            return cls()
+
+    def to_json(self):
+        with self._lock:
+            return json.dumps({'pages': self.pages, 'stylesheets': self.stylesheets}, indent=4, sort_keys=True)
+
+    def record_page(self, page_url, output, output_hash, assets, links):
+        with self._lock:
+            self.pages[page_url] = {
+                'output': output,
+                'hash': output_hash,
+                'assets': sorted(set(assets)),
+                'links': sorted(set(links)),
+            }
+
+    def record_stylesheet(self, url, refs):
+        with self._lock:
+            self.stylesheets[url] = sorted(set(refs))
+
+    def page_dependencies(self, page_url):
+        # Direct assets plus everything their stylesheets reference
+        entry = self.pages.get(page_url, {})
+        deps = set(entry.get('assets', ()))
+        pending = list(deps)
+        while pending:
+            for ref in self.stylesheets.get(pending.pop(), ()):
+                if ref not in deps:
+                    deps.add(ref)
+                    pending.append(ref)
+        return deps
+
+    def affected_pages(self, changed):
+        # Pages whose output depends on any of `changed` (page or asset urls)
+        changed = set(changed)
+        return sorted(page for page in self.pages
+                      if page in changed or self.page_dependencies(page) & changed)
+
+    def referenced_assets(self):
+        refs = set()
+        for page in self.pages:
+            refs |= self.page_dependencies(page)
+        return refs
+
+    def orphans(self, base_dir, asset_mapping, folders=GC_FOLDERS):
+        # Generated asset files in `folders` that no recorded page needs
+        referenced = self.referenced_assets()
+        keep = {os.path.normpath(path) for url, (_, path) in asset_mapping.items() if url in referenced}
+        found = []
+        for folder in folders:
+            folder_path = os.path.join(base_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for name in sorted(os.listdir(folder_path)):
+                path = os.path.normpath(os.path.join(folder_path, name))
+                if GENERATED_NAME_RE.match(name) and path not in keep:
+                    found.append(path)
+        return found
+
+    def untracked_outputs(self, base_dir, exclude=()):
+        # .html files under base_dir that no recorded page produced; any means
+        # the index is missing pages and orphans() cannot be trusted
+        outputs = {os.path.normpath(entry['output']) for entry in self.pages.values()}
+        found = []
+        for root, dirs, files in os.walk(base_dir):
+            if root == base_dir:
+                dirs[:] = [d for d in dirs if d not in exclude and not d.startswith('.')]
+            for name in files:
+                path = os.path.normpath(os.path.join(root, name))
+                if name.endswith('.html') and path not in outputs:
+                    found.append(path)
+        return sorted(found)
+
+    def diff(self, previous):
+        # What changed since `previous` (another DependencyIndex)
+        old, new = previous.pages, self.pages
+        return {
+            'added': sorted(set(new) - set(old)),
+            'removed': sorted(set(old) - set(new)),
+            'output_changed': sorted(p for p in set(new) & set(old) if new[p]['hash'] != old[p]['hash']),
+            'dependencies_changed': sorted(p for p in set(new) & set(old)
+                                           if new[p]['assets'] != old[p]['assets']
+                                           or new[p]['links'] != old[p]['links']),
+        }
+
+
+def print_diff(diff):
+    for key, pages in diff.items():
+        print(f"{key.replace('_', ' ').capitalize()}: {len(pages)}")
+        for page in pages:
+            print(f"    {page}")
+
+
+def collect_orphans(index, base_dir, asset_mapping):
+    # Delete unreferenced asset files and drop them from asset_mapping
+    orphans = set(index.orphans(base_dir, asset_mapping))
+    for path in sorted(orphans):
+        try:
+            os.unlink(path)
+            print(f"Removed unreferenced asset: {path}")
+        except OSError as e:
+            print(f"Failed to delete {path}. Reason: {e}")
+    for url, (_, path) in list(asset_mapping.items()):
+        if os.path.normpath(path) in orphans:
+            del asset_mapping[url]
+    return sorted(orphans)
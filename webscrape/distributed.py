@@ -0,0 +1,196 @@
+"""Run Scraper.scrape_page on several workers sharing one frontier.
+
+Single host, worker processes coordinated through SQLite:
+
+    webscrape distributed run --store sqlite:///frontier.db --workers 4
+
+Several hosts sharing a Redis server; start ``run`` on one host, then add
+workers elsewhere (each host needs the same output folder, e.g. a shared
+mount, or its own copy to merge afterwards):
+
+    webscrape distributed run --store redis://queue-host:6379/0 --workers 4
+    webscrape distributed worker --store redis://queue-host:6379/0 --index 4 --workers 8
+
+Once every page is done, ``run`` merges what the workers recorded into
+``dependency_index.json`` and ``asset_mapping.json``, then removes unused
+assets and pages as a plain ``webscrape scrape`` does. Workers started with
+the ``worker`` role only feed the store; the ``run`` host saves the result.
+
+Each ``run`` starts a fresh crawl: the store's frontier and visited set are
+cleared when it is seeded (asset names are kept). Pass ``--resume`` to keep
+them and carry on with an interrupted crawl instead.
+
+Record mode appends to a single archive, so use one worker for it; replay
+mode is safe with any number of workers.
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from .fetch_archive import check_archive
+from .frontier_store import DEFAULT_LEASE_SECONDS, discard_store, merged_asset_mapping, open_store
+from .scraper import Scraper, load_urls_to_scrape
+
+POLL_INTERVAL = 1.0
+# An empty frontier must be seen this many polls in a row before a worker
+# stops, which covers the moment between another worker popping a URL and
+# recording its lease.
+IDLE_POLLS = 3
+
+
+def crawl(store, scraper, index, lease_seconds=DEFAULT_LEASE_SECONDS):
+    owner = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    partition = index % store.partitions
+    visited_urls = set()
+
+    def discover(urls):
+        store.add([url for url in urls if scraper.url_policy.allows(url, 'page')])
+
+    idle = 0
+    processed = 0
+    while idle < IDLE_POLLS:
+        url = store.lease(owner, partition, lease_seconds)
+        if url is None:
+            idle = idle + 1 if store.unfinished() == 0 else 0
+            time.sleep(POLL_INTERVAL)
+            continue
+        idle = 0
+        scraper.scrape_page(url, visited_urls, discover)
+        share_page(store, scraper, url)
+        store.complete(url)
+        processed += 1
+    print(f"Worker {owner} finished after {processed} pages")
+    return processed
+
+
+def seed(store, scraper, urls=None, resume=False):
+    # Keep names from earlier runs so existing asset files are reused
+    scraper.load_state()
+    if not resume:
+        store.reset()
+    store.merge_assets(scraper.asset_mapping)
+    if urls is None:
+        urls = load_urls_to_scrape(scraper.urls_file)
+    added = store.add([scraper.start_url] + list(urls))
+    unfinished = store.unfinished()
+    print(f"Seeded {added} URLs ({unfinished} unfinished)")
+    if unfinished == 0:
+        print("Warning: nothing left to crawl in this store; drop --resume to start over")
+    return added
+
+
+def share_page(store, scraper, url):
+    # Hand the page's index entry to the store before the page is marked
+    # done, so once the frontier is empty the store has every page
+    entry = scraper.dependency_index.pages.get(url)
+    if entry is None:
+        if url in scraper.failed_pages:
+            store.record_page(url, None, {})
+        return
+    stylesheets = scraper.dependency_index.stylesheets
+    store.record_page(url, entry, {css: stylesheets[css] for css in entry['assets'] if css in stylesheets})
+
+
+def finish_run(store, scraper):
+    # Runs once, after the workers: the merged index and asset mapping are
+    # saved, then assets and pages are collected as in Scraper.run()
+    scraper.load_state()
+    pages, stylesheets = store.recorded_pages()
+    for url, entry in pages.items():
+        if entry is None:
+            scraper.failed_pages.add(url)
+        else:
+            scraper.dependency_index.pages[url] = entry
+    scraper.dependency_index.stylesheets.update(stylesheets)
+    # Names are assigned before the download, so skip assets that failed
+    merged = merged_asset_mapping(store, scraper.base_dir)
+    scraper.asset_mapping.update((url, value) for url, value in merged.items() if os.path.exists(value[1]))
+    with scraper:
+        # Pages were written by the workers, not by this Scraper's writer
+        for entry in scraper.dependency_index.pages.values():
+            scraper.output_writer.keep(entry['output'])
+        scraper.complete_run(store.urls())
+
+
+def worker_main(store_url, index, workers, options, lease_seconds=DEFAULT_LEASE_SECONDS):
+    scraper = Scraper(**options)
+    store = open_store(store_url, workers)
+    scraper.load_state()
+    scraper.asset_namer = store.assign_asset
+    try:
+        with scraper:
+            crawl(store, scraper, index, lease_seconds)
+        scraper.url_policy.report()
+    finally:
+        store.close()
+
+
+def seed_main(store_url, workers, options, urls=None, resume=False):
+    store = open_store(store_url, workers)
+    try:
+        seed(store, Scraper(**options), urls, resume)
+    finally:
+        store.close()
+
+
+def finish_main(store_url, workers, options):
+    store = open_store(store_url, workers)
+    try:
+        finish_run(store, Scraper(**options))
+    finally:
+        store.close()
+
+
+def run_threads(store_url, workers, options, urls=None, lease_seconds=DEFAULT_LEASE_SECONDS, resume=False):
+    # memory:// stores live in this process, so workers are threads sharing
+    # one Scraper; the store is dropped once the crawl is over
+    scraper = Scraper(**options)
+    try:
+        seed(open_store(store_url, workers), scraper, urls, resume)
+        scraper.asset_namer = open_store(store_url, workers).assign_asset
+        with scraper:
+            threads = [threading.Thread(target=crawl,
+                                        args=(open_store(store_url, workers), scraper, i, lease_seconds))
+                       for i in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finish_run(open_store(store_url, workers), scraper)
+    finally:
+        discard_store(store_url)
+
+
+def run_processes(store_url, workers, options, urls=None, lease_seconds=DEFAULT_LEASE_SECONDS, resume=False):
+    # spawn, not fork: the caller may be a long-lived process with its own
+    # threads, and each worker should start with a clean Scraper
+    context = multiprocessing.get_context('spawn')
+    seeder = context.Process(target=seed_main, args=(store_url, workers, options, urls, resume))
+    seeder.start()
+    seeder.join()
+    if seeder.exitcode != 0:
+        raise RuntimeError(f"Seeding failed with exit code {seeder.exitcode}")
+    processes = [context.Process(target=worker_main, args=(store_url, i, workers, options, lease_seconds))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [p.exitcode for p in processes if p.exitcode != 0]
+    if failed:
+        print(f"{len(failed)} worker(s) exited with errors: {failed}")
+    finish_main(store_url, workers, options)
+
+
+def run(store_url, workers, options, urls=None, lease_seconds=DEFAULT_LEASE_SECONDS, resume=False):
+    if options.get('fetch_mode') == 'record' and workers > 1:
+        raise ValueError("Record mode writes a single archive; use one worker")
+    if options.get('fetch_mode') == 'replay':
+        # Fail here rather than in every worker
+        check_archive(options['archive_path'])
+    if store_url.startswith('memory://'):
+        run_threads(store_url, workers, options, urls, lease_seconds, resume)
+    else:
+        run_processes(store_url, workers, options, urls, lease_seconds, resume)
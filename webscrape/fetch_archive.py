@@ -0,0 +1,271 @@
+import gzip
+import json
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+from ._optional import require
+
+FETCH_MODES = ('live', 'record', 'replay')
+
+# requests hands us decoded bodies, so these headers no longer describe them
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+def _warc_record(headers, block):
+    head = ''.join(f"{name}: {value}\r\n" for name, value in headers)
+    return b"WARC/1.1\r\n" + head.encode('utf-8') + b"\r\n" + block + b"\r\n\r\n"
+
+
+def _warc_date():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _http_reason(status_code):
+    try:
+        return HTTPStatus(status_code).phrase
+    except ValueError:
+        return ''
+
+
+def _split_head(data):
+    head, _, rest = data.partition(b"\r\n\r\n")
+    lines = head.decode('utf-8', 'replace').split("\r\n")
+    fields = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        fields[name.strip()] = value.strip()
+    return lines[0], fields, rest
+
+
+class WarcWriter:
+    """Appends gzipped WARC response records and keeps a url -> offset index.
+
+    Every record is its own gzip member, so the archive is a standard
+    ``.warc.gz`` and any single record can be read back by seeking to its
+    offset. The index is saved next to the archive as ``<archive>.idx.json``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = load_index(path)
+        if self.index is None:
+            self.index = build_index(path) if os.path.exists(path) else {}
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            info = "software: webscrape-tool\r\nformat: WARC File Format 1.1\r\n".encode('utf-8')
+            self._append(None, [
+                ('WARC-Type', 'warcinfo'),
+                ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+                ('WARC-Date', _warc_date()),
+                ('WARC-Filename', os.path.basename(path)),
+                ('Content-Type', 'application/warc-fields'),
+                ('Content-Length', str(len(info))),
+            ], info)
+
+    def write_response(self, url, status_code, reason, headers, body):
+        http_head = f"HTTP/1.1 {status_code} {reason or _http_reason(status_code)}\r\n"
+        for name, value in headers.items():
+            if name.lower() not in _DROPPED_HEADERS:
+                http_head += f"{name}: {value}\r\n"
+        http_head += f"Content-Length: {len(body)}\r\n\r\n"
+        block = http_head.encode('utf-8') + body
+        self._append(url, [
+            ('WARC-Type', 'response'),
+            ('WARC-Record-ID', f"<urn:uuid:{uuid.uuid4()}>"),
+            ('WARC-Date', _warc_date()),
+            ('WARC-Target-URI', url),
+            ('Content-Type', 'application/http;msgtype=response'),
+            ('Content-Length', str(len(block))),
+        ], block)
+
+    def _append(self, url, headers, block):
+        member = gzip.compress(_warc_record(headers, block))
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(member)
+            if url is not None:
+                self.index[url] = [offset, len(member)]
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            save_index(self.path, self.index)
+
+
+class WarcReader:
+    """Serves recorded responses from a ``.warc.gz`` archive by URL.
+
+    Lookups go through the saved index (rebuilt by scanning the archive if it
+    is missing or stale), so each fetch is one seek and one small read.
+    """
+
+    def __init__(self, path):
+        check_archive(path)
+        self.path = path
+        self.index = load_index(path)
+        if self.index is None:
+            self.index = build_index(path)
+            save_index(path, self.index)
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def get(self, url):
+        # Returns (status_code, reason, headers, body) or None
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        offset, length = entry
+        with self._lock:
+            self._file.seek(offset)
+            member = self._file.read(length)
+        _, fields, rest = _split_head(gzip.decompress(member))
+        block = rest[:int(fields['Content-Length'])]
+        status_line, headers, body = _split_head(block)
+        parts = status_line.split(' ', 2)
+        status_code = int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+        return status_code, reason, headers, body
+
+    def close(self):
+        self._file.close()
+
+
+def check_archive(path):
+    if not os.path.isfile(path):
+        raise ValueError(f"Replay archive not found: {path} (create it with --mode record)")
+
+
+def _index_path(path):
+    return path + '.idx.json'
+
+
+def load_index(path):
+    # The index remembers the archive size it was built for; a different
+    # size means the archive was appended to without it, so it is stale.
+    try:
+        with open(_index_path(path), 'r') as file:
+            data = json.load(file)
+        if data.get('size') != os.path.getsize(path):
+            return None
+        return data['records']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_index(path, index):
+    with open(_index_path(path), 'w') as file:
+        json.dump({'size': os.path.getsize(path), 'records': index}, file)
+
+
+def _iter_members(file, chunk_size=1 << 16, head_limit=1 << 16):
+    # Yields (offset, length, head) for each gzip member of a .warc.gz.
+    # A member's end is only known once its deflate stream ends, so every
+    # member is inflated, but in bounded chunks whose output is dropped once
+    # the WARC header (the first `head_limit` bytes) has been seen. A
+    # truncated last member, e.g. from a crashed record run, is skipped.
+    offset = 0
+    pending = b''
+    while True:
+        data = pending or file.read(chunk_size)
+        if not data:
+            return
+        decompressor = zlib.decompressobj(wbits=31)
+        fed = 0
+        head = b''
+        while True:
+            fed += len(data)
+            out = decompressor.decompress(data, chunk_size)
+            while True:
+                if len(head) < head_limit:
+                    head += out[:head_limit - len(head)]
+                if decompressor.eof or not decompressor.unconsumed_tail:
+                    break
+                out = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+            if decompressor.eof:
+                break
+            data = file.read(chunk_size)
+            if not data:
+                print(f"Ignoring truncated record at offset {offset}")
+                return
+        pending = decompressor.unused_data
+        length = fed - len(pending)
+        yield offset, length, head
+        offset += length
+
+
+def build_index(path):
+    index = {}
+    with open(path, 'rb') as file:
+        for offset, length, head in _iter_members(file):
+            _, fields, _ = _split_head(head)
+            if fields.get('WARC-Type') == 'response' and 'WARC-Target-URI' in fields:
+                index[fields['WARC-Target-URI']] = [offset, length]
+    return index
+
+
+def _replayed_response(url, status_code, reason, headers, body):
+    requests = require('requests', "Replay")
+    CaseInsensitiveDict = require('requests.structures', "Replay").CaseInsensitiveDict
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class Fetcher:
+    """HTTP GET that can record to, or replay from, a WARC archive.
+
+    ``live`` fetches from the network, ``record`` fetches and also archives
+    every response, ``replay`` answers only from the archive and never
+    touches the network. URLs missing from the archive replay as a 404 so
+    callers handle them like any other failed fetch.
+    """
+
+    def __init__(self, mode='live', archive_path='crawl.warc.gz', session=None):
+        if mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode: {mode}")
+        self.mode = mode
+        self.session = session
+        self._owns_session = session is None and mode != 'replay'
+        if self._owns_session:
+            self.session = require('requests', "Fetching").Session()
+        self.writer = WarcWriter(archive_path) if mode == 'record' else None
+        self.reader = WarcReader(archive_path) if mode == 'replay' else None
+
+    def get(self, url, **kwargs):
+        if self.reader is not None:
+            record = self.reader.get(url)
+            if record is None:
+                print(f"Not in archive: {url}")
+                return _replayed_response(url, 404, 'Not in archive', {}, b'')
+            return _replayed_response(url, *record)
+
+        response = self.session.get(url, **kwargs)
+        if self.writer is not None:
+            self.writer.write_response(url, response.status_code, response.reason,
+                                       response.headers, response.content)
+        return response
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.reader is not None:
+            self.reader.close()
+        if self._owns_session:
+            self.session.close()
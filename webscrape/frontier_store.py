@@ -0,0 +1,448 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from ._optional import require
+
+DEFAULT_LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+
+def partition_for(url, partitions):
+    # Hash host, path and query: a mirror is usually one host, and hashing
+    # the host alone put every page in one partition and on one worker
+    parts = urlsplit(url)
+    key = f"{parts.hostname or ''}{parts.path}?{parts.query}".encode('utf-8')
+    return zlib.crc32(key) % max(partitions, 1)
+
+
+def asset_number(name):
+    # 'img-12.png' -> 12
+    try:
+        return int(name.rsplit('.', 1)[0].rsplit('-', 1)[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+class FrontierStore:
+    """Crawl frontier, visited set and asset names shared by all workers.
+
+    A URL is added once (the visited set is every URL added since the last
+    reset), leased by one worker at a time and marked done when processed.
+    Leases expire, so pages held by a crashed worker are handed out again, up
+    to MAX_ATTEMPTS times. Asset names are assigned here too, so every worker
+    writes a given asset URL to the same file; reset() keeps them. Workers
+    also record each page's dependency index entry (None if it failed), so
+    the whole run's index can be saved once every page is done.
+    """
+
+    partitions = 1
+
+    def add(self, urls):
+        raise NotImplementedError
+
+    def lease(self, owner, partition, lease_seconds=DEFAULT_LEASE_SECONDS):
+        raise NotImplementedError
+
+    def complete(self, url):
+        raise NotImplementedError
+
+    def unfinished(self):
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def urls(self):
+        raise NotImplementedError
+
+    def record_page(self, url, entry, stylesheets):
+        raise NotImplementedError
+
+    def recorded_pages(self):
+        # -> (page url -> entry or None, stylesheet url -> refs)
+        raise NotImplementedError
+
+    def assign_asset(self, url, tag_name, file_extension):
+        raise NotImplementedError
+
+    def merge_assets(self, mapping):
+        raise NotImplementedError
+
+    def assets(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteFrontierStore(FrontierStore):
+    # Single host: every mutation runs in a BEGIN IMMEDIATE transaction, so
+    # SQLite's file lock serialises workers in different processes.
+
+    def __init__(self, path, partitions=1, timeout=30):
+        self.path = path
+        self.partitions = partitions
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY, partition INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending', owner TEXT,
+                lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0)""")
+            db.execute("CREATE INDEX IF NOT EXISTS frontier_status ON frontier (status, partition)")
+            db.execute("CREATE TABLE IF NOT EXISTS assets (url TEXT PRIMARY KEY, name TEXT NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (kind TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, entry TEXT NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS stylesheets (url TEXT PRIMARY KEY, refs TEXT NOT NULL)")
+
+    @contextmanager
+    def _transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def add(self, urls):
+        rows = [(url, partition_for(url, self.partitions)) for url in urls]
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO frontier (url, partition) VALUES (?, ?)", rows)
+            return db.total_changes - before
+
+    def lease(self, owner, partition, lease_seconds=DEFAULT_LEASE_SECONDS):
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                """SELECT url FROM frontier
+                   WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                     AND attempts < ?
+                   ORDER BY partition = ? DESC, rowid LIMIT 1""",
+                (now, MAX_ATTEMPTS, partition)).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                """UPDATE frontier SET status = 'leased', owner = ?, lease_expires = ?,
+                   attempts = attempts + 1 WHERE url = ?""",
+                (owner, now + lease_seconds, row[0]))
+            return row[0]
+
+    def complete(self, url):
+        with self._transaction() as db:
+            db.execute("UPDATE frontier SET status = 'done', lease_expires = NULL WHERE url = ?", (url,))
+
+    def unfinished(self):
+        # A URL on its last attempt is still unfinished while its lease is live
+        row = self.db.execute(
+            """SELECT COUNT(*) FROM frontier WHERE status != 'done'
+               AND (attempts < ? OR (status = 'leased' AND lease_expires >= ?))""",
+            (MAX_ATTEMPTS, time.time())).fetchone()
+        return row[0]
+
+    def reset(self):
+        with self._transaction() as db:
+            db.execute("DELETE FROM frontier")
+            db.execute("DELETE FROM pages")
+            db.execute("DELETE FROM stylesheets")
+
+    def urls(self):
+        return {row[0] for row in self.db.execute("SELECT url FROM frontier")}
+
+    def record_page(self, url, entry, stylesheets):
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO pages (url, entry) VALUES (?, ?)", (url, json.dumps(entry)))
+            db.executemany("INSERT OR REPLACE INTO stylesheets (url, refs) VALUES (?, ?)",
+                           [(css, json.dumps(refs)) for css, refs in stylesheets.items()])
+
+    def recorded_pages(self):
+        pages = {url: json.loads(entry) for url, entry in self.db.execute("SELECT url, entry FROM pages")}
+        stylesheets = {url: json.loads(refs) for url, refs in self.db.execute("SELECT url, refs FROM stylesheets")}
+        return pages, stylesheets
+
+    def assign_asset(self, url, tag_name, file_extension):
+        with self._transaction() as db:
+            row = db.execute("SELECT name FROM assets WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                return row[0]
+            db.execute("INSERT OR IGNORE INTO counters (kind, value) VALUES (?, 0)", (tag_name,))
+            db.execute("UPDATE counters SET value = value + 1 WHERE kind = ?", (tag_name,))
+            number = db.execute("SELECT value FROM counters WHERE kind = ?", (tag_name,)).fetchone()[0]
+            name = f"{tag_name}-{number}.{file_extension}"
+            db.execute("INSERT INTO assets (url, name) VALUES (?, ?)", (url, name))
+            return name
+
+    def merge_assets(self, mapping):
+        # mapping is asset_mapping: url -> (simplified_name, path)
+        with self._transaction() as db:
+            for url, (name, _) in mapping.items():
+                db.execute("INSERT OR IGNORE INTO assets (url, name) VALUES (?, ?)", (url, name))
+                kind = name.rsplit('-', 1)[0]
+                db.execute("INSERT OR IGNORE INTO counters (kind, value) VALUES (?, 0)", (kind,))
+                db.execute("UPDATE counters SET value = MAX(value, ?) WHERE kind = ?",
+                           (asset_number(name), kind))
+
+    def assets(self):
+        return dict(self.db.execute("SELECT url, name FROM assets"))
+
+    def close(self):
+        self.db.close()
+
+
+class RedisFrontierStore(FrontierStore):
+    # Multi host: one list per partition holds pending URLs, a sorted set
+    # holds leases by expiry time. Works with redis-py or LocalRedis.
+
+    def __init__(self, client, partitions=1, prefix='webscrape'):
+        self.r = client
+        self.prefix = prefix
+        self.requested_partitions = partitions
+        stored = self.r.get(self._key('partitions'))
+        if stored is None:
+            self.r.set(self._key('partitions'), partitions)
+            stored = partitions
+        self.partitions = int(stored)
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def add(self, urls):
+        added = 0
+        for url in urls:
+            if self.r.sadd(self._key('seen'), url):
+                self.r.rpush(self._key('queue', str(partition_for(url, self.partitions))), url)
+                added += 1
+        return added
+
+    def _take(self, owner, url, lease_seconds):
+        attempts = self.r.hincrby(self._key('attempts'), url, 1)
+        if attempts > MAX_ATTEMPTS:
+            return False
+        self.r.zadd(self._key('leases'), {url: time.time() + lease_seconds})
+        self.r.hset(self._key('owners'), url, owner)
+        return True
+
+    def lease(self, owner, partition, lease_seconds=DEFAULT_LEASE_SECONDS):
+        order = [partition] + [p for p in range(self.partitions) if p != partition]
+        for p in order:
+            while True:
+                url = self.r.lpop(self._key('queue', str(p)))
+                if url is None:
+                    break
+                if self._take(owner, url, lease_seconds):
+                    return url
+        # Nothing pending: take over a lease that expired (worker crashed or hung)
+        for url in self.r.zrangebyscore(self._key('leases'), '-inf', time.time()):
+            # zrem returns 1 for exactly one of the workers racing for this URL
+            if self.r.zrem(self._key('leases'), url) and self._take(owner, url, lease_seconds):
+                return url
+        return None
+
+    def complete(self, url):
+        self.r.zrem(self._key('leases'), url)
+        self.r.hdel(self._key('owners'), url)
+
+    def unfinished(self):
+        # URLs over MAX_ATTEMPTS are dropped in lease(), so they are not counted here
+        queued = sum(self.r.llen(self._key('queue', str(p))) for p in range(self.partitions))
+        return queued + self.r.zcard(self._key('leases'))
+
+    def reset(self):
+        queues = [self._key('queue', str(p)) for p in range(self.partitions)]
+        self.r.delete(self._key('seen'), self._key('leases'), self._key('owners'),
+                      self._key('attempts'), self._key('pages'), self._key('stylesheets'), *queues)
+        # A fresh crawl may use a different number of workers
+        self.partitions = self.requested_partitions
+        self.r.set(self._key('partitions'), self.partitions)
+
+    def urls(self):
+        return set(self.r.smembers(self._key('seen')))
+
+    def record_page(self, url, entry, stylesheets):
+        self.r.hset(self._key('pages'), url, json.dumps(entry))
+        for css, refs in stylesheets.items():
+            self.r.hset(self._key('stylesheets'), css, json.dumps(refs))
+
+    def recorded_pages(self):
+        pages = {url: json.loads(entry) for url, entry in self.r.hgetall(self._key('pages')).items()}
+        stylesheets = {url: json.loads(refs) for url, refs in self.r.hgetall(self._key('stylesheets')).items()}
+        return pages, stylesheets
+
+    def assign_asset(self, url, tag_name, file_extension):
+        name = self.r.hget(self._key('assets'), url)
+        if name is not None:
+            return name
+        number = self.r.incr(self._key('counter', tag_name))
+        name = f"{tag_name}-{number}.{file_extension}"
+        if not self.r.hsetnx(self._key('assets'), url, name):
+            name = self.r.hget(self._key('assets'), url)
+        return name
+
+    def merge_assets(self, mapping):
+        for url, (name, _) in mapping.items():
+            self.r.hsetnx(self._key('assets'), url, name)
+            counter = self._key('counter', name.rsplit('-', 1)[0])
+            current = int(self.r.get(counter) or 0)
+            if asset_number(name) > current:
+                self.r.set(counter, asset_number(name))
+
+    def assets(self):
+        return dict(self.r.hgetall(self._key('assets')))
+
+
+class LocalRedis:
+    """In-process stand-in for the handful of Redis commands used above.
+
+    Thread safe but not shared between processes; use it for tests and for
+    threaded workers in one process.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.RLock()
+
+    def _get(self, key, factory):
+        return self._data.setdefault(key, factory())
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            return None if value is None else str(value)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = str(value)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, 0)) + 1
+            self._data[key] = str(value)
+            return value
+
+    def sadd(self, key, member):
+        with self._lock:
+            members = self._get(key, set)
+            if member in members:
+                return 0
+            members.add(member)
+            return 1
+
+    def smembers(self, key):
+        with self._lock:
+            return set(self._data.get(key, ()))
+
+    def rpush(self, key, value):
+        with self._lock:
+            items = self._get(key, list)
+            items.append(value)
+            return len(items)
+
+    def lpop(self, key):
+        with self._lock:
+            items = self._data.get(key)
+            return items.pop(0) if items else None
+
+    def llen(self, key):
+        with self._lock:
+            return len(self._data.get(key, ()))
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            self._get(key, dict).update(mapping)
+            return len(mapping)
+
+    def zrem(self, key, member):
+        with self._lock:
+            return 1 if self._get(key, dict).pop(member, None) is not None else 0
+
+    def zrangebyscore(self, key, low, high):
+        low = float(low)
+        high = float(high)
+        with self._lock:
+            scores = self._data.get(key, {})
+            return [m for m, s in sorted(scores.items(), key=lambda i: i[1]) if low <= s <= high]
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._data.get(key, ()))
+
+    def hget(self, key, field):
+        with self._lock:
+            return self._data.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        with self._lock:
+            self._get(key, dict)[field] = value
+            return 1
+
+    def hsetnx(self, key, field, value):
+        with self._lock:
+            fields = self._get(key, dict)
+            if field in fields:
+                return 0
+            fields[field] = value
+            return 1
+
+    def hdel(self, key, field):
+        with self._lock:
+            return 1 if self._get(key, dict).pop(field, None) is not None else 0
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            fields = self._get(key, dict)
+            fields[field] = int(fields.get(field, 0)) + amount
+            return fields[field]
+
+    def hgetall(self, key):
+        with self._lock:
+            return dict(self._data.get(key, {}))
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+
+_local_redis = {}
+
+
+def open_store(url, partitions=1):
+    """Open a store from a URL.
+
+    ``sqlite:///path/to/frontier.db`` - SQLite file, workers on one host
+    ``redis://host:6379/0``           - Redis (needs the ``redis`` package)
+    ``memory://name``                 - LocalRedis, threads in this process only
+    """
+    scheme, _, rest = url.partition('://')
+    if scheme == 'sqlite':
+        # sqlite:///relative.db and sqlite:////absolute/path.db, as in SQLAlchemy
+        return SQLiteFrontierStore(rest[1:] if rest.startswith('/') else rest, partitions)
+    if scheme in ('redis', 'rediss'):
+        redis = require('redis', "redis:// stores")
+        return RedisFrontierStore(redis.Redis.from_url(url, decode_responses=True), partitions)
+    if scheme == 'memory':
+        client = _local_redis.setdefault(rest, LocalRedis())
+        return RedisFrontierStore(client, partitions)
+    raise ValueError(f"Unknown store URL: {url}")
+
+
+def discard_store(url):
+    # memory:// stores otherwise live as long as the process; others are kept
+    scheme, _, rest = url.partition('://')
+    if scheme == 'memory':
+        _local_redis.pop(rest, None)
+
+
+def merged_asset_mapping(store, base_dir):
+    # All workers' assets in the same shape as Scraper.asset_mapping
+    mapping = {}
+    for url, name in store.assets().items():
+        folder = name.rsplit('-', 1)[0]
+        mapping[url] = (name, os.path.join(base_dir, folder, name))
+    return mapping
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import queue
+import secrets
+import stat
+import threading
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    try:
+        with open(path, 'rb') as file:
+            return content_hash(file.read())
+    except OSError:
+        return None
+
+
+def _create_temp(folder, basename):
+    # Like mkstemp, but created as 0666 so the process umask applies as it
+    # would for a plain open(); mkstemp's 0600 would make outputs private
+    while True:
+        tmp_path = os.path.join(folder or '.', f".tmp-{secrets.token_hex(8)}-{basename}")
+        try:
+            return os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+def _copy_mode(path, tmp_path):
+    # Replacing a file keeps its permissions
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+        pass
+
+
+class OutputWriter:
+    """Writes output files only when their content changed.
+
+    Each write is compared against what is already on disk (by SHA-256) and
+    skipped when identical, so unchanged files keep their mtime. Changed
+    files are written to a temp file in the same folder and renamed into
+    place. Directories are created once per run and remembered. With
+    ``background=True`` writes are queued to a single I/O thread; call
+    ``flush()`` before reading files back and ``close()`` at the end.
+    """
+
+    def __init__(self, background=True, max_pending=256):
+        self.created_dirs = set()
+        self.known_hashes = {}
+        self.touched = set()
+        self.stats = {'written': 0, 'unchanged': 0, 'failed': 0}
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._worker, name='output-writer', daemon=True)
+            self._thread.start()
+
+    def ensure_dir(self, path):
+        if path and path not in self.created_dirs:
+            os.makedirs(path, exist_ok=True)
+            self.created_dirs.add(path)
+        return path
+
+    def write(self, path, data, encoding='utf-8'):
+        if isinstance(data, str):
+            data = data.encode(encoding)
+        path = os.path.normpath(path)
+        with self._lock:
+            self.touched.add(path)
+        if self._queue is None:
+            self._write(path, data)
+        else:
+            self._queue.put((path, data))
+
+    def keep(self, path):
+        # Count an existing file as produced by this run, so prune() leaves it
+        with self._lock:
+            self.touched.add(os.path.normpath(path))
+
+    def flush(self):
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._queue = None
+            self._thread = None
+
+    def prune(self, directory, extensions=('.html',), exclude=None):
+        # Remove output files under `directory` that were not written (or
+        # confirmed unchanged) during this run, e.g. pages that disappeared.
+        self.flush()
+        exclude = set(exclude or [])
+        removed = []
+        for root, dirs, files in os.walk(directory):
+            if root == directory:
+                dirs[:] = [d for d in dirs if d not in exclude and not d.startswith('.')]
+            for name in files:
+                path = os.path.normpath(os.path.join(root, name))
+                if name.endswith(tuple(extensions)) and path not in self.touched:
+                    try:
+                        os.unlink(path)
+                        removed.append(path)
+                    except OSError as e:
+                        print(f"Failed to delete {path}. Reason: {e}")
+        return removed
+
+    def report(self):
+        print(f"Output files: {self.stats['written']} written, "
+              f"{self.stats['unchanged']} unchanged, {self.stats['failed']} failed")
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, data):
+        new_hash = content_hash(data)
+        old_hash = self.known_hashes.get(path)
+        if old_hash is None:
+            old_hash = file_hash(path)
+        if old_hash == new_hash:
+            self.known_hashes[path] = new_hash
+            self.stats['unchanged'] += 1
+            return
+
+        folder = os.path.dirname(path)
+        tmp_path = None
+        try:
+            self.ensure_dir(folder)
+            fd, tmp_path = _create_temp(folder, os.path.basename(path))
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            _copy_mode(path, tmp_path)
+            os.replace(tmp_path, path)
+            self.known_hashes[path] = new_hash
+            self.stats['written'] += 1
+        except OSError as e:
+            print(f"Error writing {path}: {e}")
+            self.stats['failed'] += 1
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
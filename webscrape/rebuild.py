@@ -0,0 +1,97 @@
+"""Rebuild only the pages affected by changed assets or pages.
+
+    webscrape rebuild https://assets-global.website-files.com/.../site.css
+    webscrape rebuild seointense/css/css-3.css https://seo-intense-final.webflow.io/about
+    webscrape gc
+    webscrape diff old_dependency_index.json dependency_index.json
+
+``rebuild`` takes asset URLs, local asset paths or page URLs. Changed assets
+are fetched again, then only the pages that use them are re-scraped (without
+following links). Unreferenced generated files in img/, css/ and js/ are
+removed afterwards. Works with ``--mode replay`` for offline rebuilds.
+
+Both need a dependency index that covers the mirror. With no index, an
+empty one, or one missing pages that are on disk (e.g. a mirror made before
+the index existed), nothing could tell which assets are still used, so they
+refuse to run; do a full ``webscrape scrape`` first, or pass ``--force``.
+"""
+import os
+
+from .dependency_index import DependencyIndex, css_references, print_diff
+
+
+def load_for_rebuild(scraper, force=False):
+    # Start from the previous index instead of an empty one: only some
+    # pages are re-scraped, the rest keep their recorded dependencies
+    scraper.load_state()
+    previous = scraper.previous_index
+    if not force:
+        check_index(scraper, previous)
+    scraper.dependency_index = DependencyIndex(dict(previous.pages), dict(previous.stylesheets))
+    return previous
+
+
+def check_index(scraper, index):
+    if not index.pages:
+        problem = f"{scraper.dependency_index_file} is missing or empty"
+    else:
+        untracked = index.untracked_outputs(scraper.base_dir, exclude=scraper.asset_folders)
+        if not untracked:
+            return
+        problem = (f"{scraper.dependency_index_file} does not cover {len(untracked)} "
+                   f"page(s) in {scraper.base_dir}, e.g. {untracked[0]}")
+    raise RuntimeError(f"{problem}; run a full scrape first or pass --force "
+                       "(unindexed assets would be deleted)")
+
+
+def resolve_changed(changed, asset_mapping):
+    # Local paths ('seointense/css/css-3.css') -> the asset URL they came from
+    by_path = {os.path.normpath(path): url for url, (_, path) in asset_mapping.items()}
+    return [by_path.get(os.path.normpath(item), item) for item in changed]
+
+
+def refetch_asset(scraper, url):
+    name, path = scraper.asset_mapping[url]
+    tag_name = name.rsplit('-', 1)[0]
+    try:
+        response = scraper.fetcher.get(url)
+        response.raise_for_status()
+    except Exception as e:
+        # Keep going: the other assets and pages still get rebuilt and saved
+        print(f"Error fetching changed asset: {e}, URL: {url}")
+        return
+    scraper.output_writer.write(path, scraper.transform_asset(tag_name, response.content))
+    if tag_name == 'css':
+        scraper.dependency_index.record_stylesheet(url, css_references(response.text, url))
+
+
+def finish(scraper, previous):
+    scraper.finish()
+    scraper.output_writer.close()
+    scraper.output_writer.report()
+    print_diff(scraper.dependency_index.diff(previous))
+
+
+def rebuild(scraper, changed, force=False):
+    previous = load_for_rebuild(scraper, force)
+    with scraper:
+        changed = resolve_changed(changed, scraper.asset_mapping)
+        for url in changed:
+            if url in scraper.asset_mapping:
+                refetch_asset(scraper, url)
+        pages = scraper.dependency_index.affected_pages(changed)
+        print(f"Rebuilding {len(pages)} affected pages")
+        for page_url in pages:
+            scraper.scrape_page(page_url, set(), discover=lambda links: None)
+        finish(scraper, previous)
+    return pages
+
+
+def collect_garbage(scraper, force=False):
+    previous = load_for_rebuild(scraper, force)
+    with scraper:
+        finish(scraper, previous)
+
+
+def diff_files(old_path, new_path):
+    print_diff(DependencyIndex.load(new_path).diff(DependencyIndex.load(old_path)))
@@ -0,0 +1,185 @@
+import fnmatch
+import ipaddress
+import re
+from collections import Counter, namedtuple
+from urllib.parse import urlsplit
+
+# A single allow/deny rule.
+#   action: 'allow' or 'deny'
+#   kind:   'host'  - host suffix, e.g. 'website-files.com' matches 'assets-global.website-files.com'
+#           'path'  - glob on the URL path, e.g. '/blog/*'
+#           'regex' - regular expression searched in the full URL
+#   scope:  'page', 'asset' or None for both
+Rule = namedtuple('Rule', ['action', 'kind', 'pattern', 'scope'])
+Rule.__new__.__defaults__ = (None,)
+
+SCOPES = ('page', 'asset')
+ALLOWED_SCHEMES = ('http', 'https')
+
+
+def rule_label(rule):
+    return f"{rule.action} {rule.kind} {rule.pattern}"
+
+
+class _HostTrie:
+    # Trie over reversed host labels ('com' -> 'website-files' -> ...), so a
+    # lookup costs one step per label instead of one scan per configured domain.
+    _END = object()
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, suffix, rule):
+        node = self.root
+        for label in reversed(suffix.lower().strip('.').split('.')):
+            node = node.setdefault(label, {})
+        node.setdefault(self._END, rule)
+
+    def match(self, host):
+        node = self.root
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return None
+            if self._END in node:
+                return node[self._END]
+        return None
+
+
+class _PatternSet:
+    # Patterns of one kind, combined into a single alternation where that is
+    # safe. A pattern with its own groups (backreferences, or fnmatch output
+    # on older Pythons) or global inline flags such as (?i) would change
+    # meaning inside the alternation, so those are checked one by one.
+
+    def __init__(self, rules, patterns, search=False):
+        combinable = []
+        self.separate = []
+        for rule, pattern in zip(rules, patterns):
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern in rule '{rule_label(rule)}': {e}") from None
+            if compiled.groups or compiled.flags & ~re.UNICODE:
+                self.separate.append((rule, compiled))
+            else:
+                combinable.append((rule, pattern))
+        self.combined_rules = [rule for rule, _ in combinable]
+        parts = [f"(?P<r{i}>{pattern})" for i, (_, pattern) in enumerate(combinable)]
+        self.combined = re.compile('|'.join(parts)) if parts else None
+        self.search = search
+
+    def __bool__(self):
+        return self.combined is not None or bool(self.separate)
+
+    def match(self, text):
+        if self.combined is not None:
+            m = self.combined.search(text) if self.search else self.combined.match(text)
+            if m:
+                return self.combined_rules[int(m.lastgroup[1:])]
+        for rule, compiled in self.separate:
+            if (compiled.search(text) if self.search else compiled.match(text)):
+                return rule
+        return None
+
+
+class _RuleSet:
+    # All rules of one action for one scope, compiled into a host trie and
+    # two pattern sets (one for path globs, one for URL regexes).
+
+    def __init__(self, rules):
+        self.hosts = _HostTrie()
+        path_rules = []
+        regex_rules = []
+        for rule in rules:
+            if rule.kind == 'host':
+                self.hosts.add(rule.pattern, rule)
+            elif rule.kind == 'path':
+                path_rules.append(rule)
+            elif rule.kind == 'regex':
+                regex_rules.append(rule)
+            else:
+                raise ValueError(f"Unknown rule kind: {rule.kind}")
+        self.paths = _PatternSet(path_rules, [fnmatch.translate(r.pattern) for r in path_rules])
+        self.regexes = _PatternSet(regex_rules, [r.pattern for r in regex_rules], search=True)
+        self.empty = not (self.hosts.root or self.paths or self.regexes)
+
+    def match(self, url, host, path):
+        rule = self.hosts.match(host)
+        if rule is not None:
+            return rule
+        return self.paths.match(path) or self.regexes.match(url)
+
+
+def is_loopback(host):
+    if host == 'localhost' or host.endswith('.localhost'):
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class UrlPolicy:
+    """Decides which URLs may be fetched, for pages and for assets.
+
+    Rules are compiled once. Deny rules always win; when a scope has any
+    allow rules, a URL must match one of them to be fetched. Non-http(s)
+    and loopback URLs are always rejected. Every decision is counted in
+    ``hits`` under the rule (or built-in reason) that produced it.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = [Rule(*r) for r in rules]
+        self._allow = {}
+        self._deny = {}
+        for scope in SCOPES:
+            in_scope = [r for r in self.rules if r.scope in (None, scope)]
+            self._allow[scope] = _RuleSet(r for r in in_scope if r.action == 'allow')
+            self._deny[scope] = _RuleSet(r for r in in_scope if r.action == 'deny')
+        self.hits = Counter()
+
+    def check(self, url, scope='page'):
+        # Returns (allowed, reason)
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scope: {scope}")
+        try:
+            parts = urlsplit(url)
+            host = (parts.hostname or '').rstrip('.')
+        except ValueError:
+            return self._count(False, 'invalid url')
+        if parts.scheme not in ALLOWED_SCHEMES or not host:
+            return self._count(False, 'non-http url')
+        if is_loopback(host):
+            return self._count(False, 'loopback host')
+
+        path = parts.path or '/'
+        rule = self._deny[scope].match(url, host, path)
+        if rule is not None:
+            return self._count(False, rule_label(rule))
+
+        allow = self._allow[scope]
+        if allow.empty:
+            return self._count(True, 'default allow')
+        rule = allow.match(url, host, path)
+        if rule is None:
+            return self._count(False, f"not included ({scope})")
+        return self._count(True, rule_label(rule))
+
+    def allows(self, url, scope='page'):
+        return self.check(url, scope)[0]
+
+    def _count(self, allowed, reason):
+        self.hits[reason] += 1
+        return allowed, reason
+
+    def report(self):
+        for reason, count in self.hits.most_common():
+            print(f"{count:6d}  {reason}")
+
+
+def is_loopback_url(url):
+    try:
+        return is_loopback((urlsplit(url).hostname or '').rstrip('.'))
+    except ValueError:
+        return False